@@ -0,0 +1,73 @@
+"""Compare the memory footprint of a list of song dicts with SongCatalog.
+
+Sizes are Python allocations traced by ``tracemalloc`` (live after loading,
+and the peak while loading), not the process RSS.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Tuple
+
+from lyricsgpt import GenerationConfig, load_song_catalog, load_songs_from_json
+
+
+def build_catalog_file(source: Path, size: int, target: Path) -> None:
+    """Write ``size`` songs by cycling the source dataset with unique titles."""
+
+    base = load_songs_from_json(source)
+    songs = [
+        dict(base[idx % len(base)], title=f"{base[idx % len(base)]['title']} #{idx}")
+        for idx in range(size)
+    ]
+    target.write_text(json.dumps(songs, ensure_ascii=False), encoding="utf-8")
+
+
+def measure(loader: Callable[[Path], Any], path: Path) -> Tuple[Any, int, int]:
+    gc.collect()
+    tracemalloc.start()
+    data = loader(path)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--songs", type=int, default=200_000)
+    parser.add_argument("--source", type=Path, default=GenerationConfig().output_path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "catalog.json"
+        build_catalog_file(args.source, args.songs, path)
+
+        rows = []
+        for name, loader in (
+            ("list[dict]", load_songs_from_json),
+            ("SongCatalog (raw)", lambda p: load_song_catalog(p, compress=False)),
+            ("SongCatalog", load_song_catalog),
+        ):
+            data, current, peak = measure(loader, path)
+            assert len(data) == args.songs
+            rows.append((name, current, peak))
+            del data
+
+    print(f"{args.songs:,} songs")
+    print(f"{'layout':<18} {'traced MiB':>13} {'load peak MiB':>14} {'vs list[dict]':>14}")
+    baseline = rows[0][1]
+    for name, current, peak in rows:
+        print(
+            f"{name:<18} {current / 2**20:>13.1f} {peak / 2**20:>14.1f}"
+            f" {current / baseline:>14.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
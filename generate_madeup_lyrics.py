@@ -24,6 +24,7 @@ def main() -> None:
         print()
 
     print(f"Saved {len(dataset)} songs to {config.output_path.resolve()}")
+    print(f"Quality report written to {config.report_path.resolve()}")
 
 
 if __name__ == "__main__":
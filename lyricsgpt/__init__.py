@@ -1,22 +1,37 @@
 """Utilities for generating and storing synthetic song lyrics."""
 
+from .cache import SemanticAnswerCache
 from .client import get_client
 from .config import GenerationConfig
+from .context import pack_context
+from .conversation import QASession
+from .generator import generate_validated_batch
 from .pipeline import create_lyrics_dataset
 from .prompts import SONG_PROMPTS, SongPrompt
 from .qa import answer_question
 from .questions import append_question, load_questions
-from .storage import load_songs_from_json, save_songs_to_json
+from .records import SongCatalog, SongRecord
+from .storage import load_song_catalog, load_songs_from_json, save_songs_to_json
+from .validation import QualityReport, validate_lyrics
 
 __all__ = [
     "GenerationConfig",
+    "QASession",
+    "QualityReport",
+    "SemanticAnswerCache",
+    "SongCatalog",
     "SongPrompt",
+    "SongRecord",
     "SONG_PROMPTS",
     "answer_question",
     "append_question",
     "create_lyrics_dataset",
+    "generate_validated_batch",
     "get_client",
     "load_questions",
+    "load_song_catalog",
     "load_songs_from_json",
+    "pack_context",
     "save_songs_to_json",
+    "validate_lyrics",
 ]
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from .context import stem_word
+
+EMBEDDING_DIM = 512
+# Cosine only preselects candidates; the word checks in _same_question decide.
+# A question that keeps one of three content words still scores 0.577.
+QUESTION_THRESHOLD = 0.55
+EXCERPT_THRESHOLD = 0.9
+# At most one content word may differ ("ex" vs "ex lover"), but a swap
+# ("sad" vs "happy") differs by two. A question may also drop up to two words
+# of the cached one without adding any ("13 reference" vs "fleet number 13").
+MAX_UNSHARED_TERMS = 1
+MAX_DROPPED_TERMS = 2
+MAX_ENTRIES = 4096
+MAX_ENTRIES_PER_SONG = 256
+INITIAL_ROWS = 4
+SIMILARITY_BINS = np.linspace(0.0, 1.0, 11)
+SIMILARITY_WINDOW = 10_000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Words that carry the phrasing of a question rather than what it is about.
+# Interrogatives like who/why/when and pronouns like you/me stay: "who are
+# you?" and "why is it sad?" ask different things than "what does it mean?".
+_STOPWORDS = frozenset(
+    "a about an and are as at be by can could do does did explain for from how in"
+    " is it its line lines lyric lyrics mean meaning means of on or refer reference"
+    " referenced referring represent represents signify song symbolize symbolizes"
+    " tell that the this to trying was what which with would".split()
+)
+# Must match exactly between questions; "t" is what "didn't" leaves behind.
+_NEGATIONS = frozenset({"no", "nor", "not", "never", "cannot", "without", "t"})
+
+SongKey = Tuple[str, bool]
+
+
+def _question_terms(text: str) -> List[str]:
+    """Stemmed content words of ``text``; all of its words if it has no content words."""
+
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [stem_word(word) for word in [w for w in tokens if w not in _STOPWORDS] or tokens]
+
+
+def _key_terms(text: str) -> FrozenSet[str]:
+    return frozenset(
+        word for word in _TOKEN_RE.findall(text.lower()) if word.isdigit() or word in _NEGATIONS
+    )
+
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Hash the stemmed content words of ``text`` into a unit vector.
+
+    CRC32 is used instead of ``hash`` so vectors are stable across processes.
+    Only whole words are hashed: shared letters ("12" vs "13", "sad" vs
+    "happy") must not make different questions look alike.
+    """
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for term in _question_terms(text):
+        vector[zlib.crc32(term.encode()) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass(frozen=True)
+class _Entry:
+    question: str
+    terms: FrozenSet[str]
+    key_terms: FrozenSet[str]
+    result: Dict[str, Any]
+
+
+def _entry(question: str, result: Dict[str, Any]) -> _Entry:
+    return _Entry(
+        question=question.strip(),
+        terms=frozenset(_question_terms(question)),
+        key_terms=_key_terms(question),
+        result=result,
+    )
+
+
+def _same_question(asked: _Entry, cached: _Entry) -> bool:
+    """Word-level check behind the cosine match, so one swapped word is not a paraphrase."""
+
+    if not asked.terms or asked.key_terms != cached.key_terms:
+        return False
+    added = asked.terms - cached.terms
+    dropped = cached.terms - asked.terms
+    return len(added) + len(dropped) <= MAX_UNSHARED_TERMS or (
+        not added and len(dropped) <= MAX_DROPPED_TERMS
+    )
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    """A stored answer served for a semantically similar question."""
+
+    result: Dict[str, Any]
+    question: str
+    similarity: float
+
+
+@dataclass
+class _SongCache:
+    """Embedding matrices for one song; rows grow on demand and stay contiguous."""
+
+    questions: np.ndarray
+    excerpts: np.ndarray
+    last_used: np.ndarray
+    ids: List[int] = field(default_factory=list)
+    entries: List[_Entry] = field(default_factory=list)
+
+    @classmethod
+    def allocate(cls, capacity: int, dim: int) -> "_SongCache":
+        return cls(
+            questions=np.zeros((capacity, dim), dtype=np.float32),
+            excerpts=np.zeros((capacity, dim), dtype=np.float32),
+            last_used=np.zeros(capacity, dtype=np.int64),
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.questions.nbytes + self.excerpts.nbytes + self.last_used.nbytes
+
+    def add(
+        self,
+        entry_id: int,
+        question_vec: np.ndarray,
+        excerpt_vec: np.ndarray,
+        entry: _Entry,
+        clock: int,
+    ) -> None:
+        row = self.size
+        if row == len(self.questions):
+            capacity = max(row * 2, INITIAL_ROWS)
+            self.questions = np.resize(self.questions, (capacity, self.questions.shape[1]))
+            self.excerpts = np.resize(self.excerpts, (capacity, self.excerpts.shape[1]))
+            self.last_used = np.resize(self.last_used, capacity)
+        self.questions[row] = question_vec
+        self.excerpts[row] = excerpt_vec
+        self.last_used[row] = clock
+        self.ids.append(entry_id)
+        self.entries.append(entry)
+
+    def remove(self, row: int) -> int:
+        """Drop ``row`` by moving the last row into its place; return its entry id."""
+
+        last = self.size - 1
+        removed = self.ids[row]
+        if row != last:
+            self.questions[row] = self.questions[last]
+            self.excerpts[row] = self.excerpts[last]
+            self.last_used[row] = self.last_used[last]
+            self.ids[row] = self.ids[last]
+            self.entries[row] = self.entries[last]
+        self.ids.pop()
+        self.entries.pop()
+        return removed
+
+
+@dataclass
+class SemanticAnswerCache:
+    """Serve paraphrased questions about the same excerpt from stored answers.
+
+    Each (song, ``allow_web``) pair owns a matrix of question embeddings and a
+    matrix of excerpt embeddings that grow as entries are added; a lookup is two
+    matrix-vector products. A hit requires the excerpt to be (nearly) the same
+    and the question to clear ``question_threshold``; the candidate must then
+    have the same numbers and negations and differ by at most one content word
+    (see :func:`_same_question`). Size is capped at ``max_entries`` overall and
+    ``max_entries_per_song``; the least recently used entry is evicted (across
+    all songs for the global cap).
+
+    Stored results never carry a ``response_id``, so a hit cannot be used to
+    chain onto another caller's conversation.
+    """
+
+    question_threshold: float = QUESTION_THRESHOLD
+    excerpt_threshold: float = EXCERPT_THRESHOLD
+    max_entries: int = MAX_ENTRIES
+    max_entries_per_song: int = MAX_ENTRIES_PER_SONG
+    dim: int = EMBEDDING_DIM
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    similarities: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=SIMILARITY_WINDOW), repr=False
+    )
+    _songs: Dict[SongKey, _SongCache] = field(default_factory=dict, repr=False)
+    _lru: "OrderedDict[int, SongKey]" = field(default_factory=OrderedDict, repr=False)
+    _clock: int = field(default=0, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def lookup(
+        self,
+        song_title: str,
+        excerpt: str,
+        question: str,
+        *,
+        allow_web: bool = True,
+    ) -> Optional[CacheHit]:
+        """Return the closest cached answer, or ``None`` below the thresholds."""
+
+        asked = _entry(question, {})
+        question_vec = embed_text(question, self.dim)
+        excerpt_vec = embed_text(excerpt, self.dim)
+        with self._lock:
+            song = self._songs.get((song_title, allow_web))
+            row = -1
+            if song is not None and song.size:
+                question_sims = song.questions[: song.size] @ question_vec
+                excerpt_sims = song.excerpts[: song.size] @ excerpt_vec
+                same_excerpt = excerpt_sims >= self.excerpt_threshold
+                if not excerpt_vec.any():
+                    same_excerpt = ~song.excerpts[: song.size].any(axis=1)
+                candidates = np.where(same_excerpt, question_sims, -1.0)
+                if candidates.max() >= 0.0:
+                    self.similarities.append(float(candidates.max()))
+                for candidate in np.argsort(-candidates):
+                    if candidates[candidate] < self.question_threshold:
+                        break
+                    if _same_question(asked, song.entries[candidate]):
+                        row = int(candidate)
+                        break
+
+            if row < 0:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._clock += 1
+            song.last_used[row] = self._clock
+            self._lru.move_to_end(song.ids[row])
+            entry = song.entries[row]
+            return CacheHit(
+                result=dict(entry.result),
+                question=entry.question,
+                similarity=round(float(candidates[row]), 3),
+            )
+
+    def store(
+        self,
+        song_title: str,
+        excerpt: str,
+        question: str,
+        result: Dict[str, Any],
+        *,
+        allow_web: bool = True,
+    ) -> None:
+        """Cache ``result`` for the (song, excerpt, question, ``allow_web``) combination."""
+
+        entry = _entry(
+            question, {key: value for key, value in result.items() if key != "response_id"}
+        )
+        question_vec = embed_text(question, self.dim)
+        excerpt_vec = embed_text(excerpt, self.dim)
+        key = (song_title, allow_web)
+        with self._lock:
+            song = self._songs.get(key)
+            if song is not None and song.size >= self.max_entries_per_song:
+                self._evict(key, int(np.argmin(song.last_used[: song.size])))
+            elif len(self._lru) >= self.max_entries:
+                oldest_id, oldest_key = next(iter(self._lru.items()))
+                self._evict(oldest_key, self._songs[oldest_key].ids.index(oldest_id))
+
+            song = self._songs.get(key)
+            if song is None:
+                song = _SongCache.allocate(INITIAL_ROWS, self.dim)
+                self._songs[key] = song
+            self._clock += 1
+            song.add(self._clock, question_vec, excerpt_vec, entry, self._clock)
+            self._lru[self._clock] = key
+
+    def _evict(self, key: SongKey, row: int) -> None:
+        song = self._songs[key]
+        del self._lru[song.remove(row)]
+        if not song.size:
+            del self._songs[key]
+        self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, size, eviction count and the distribution of best-match similarity.
+
+        The distribution covers the most recent ``SIMILARITY_WINDOW`` lookups
+        that had a candidate with the same excerpt.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            sims = np.asarray(self.similarities, dtype=np.float32)
+            histogram, _ = np.histogram(sims, bins=SIMILARITY_BINS)
+            return {
+                "lookups": lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._lru),
+                "songs": len(self._songs),
+                "bytes": sum(song.nbytes for song in self._songs.values()),
+                "similarity": {
+                    "p50": round(float(np.percentile(sims, 50)), 3) if sims.size else None,
+                    "p90": round(float(np.percentile(sims, 90)), 3) if sims.size else None,
+                    "histogram": histogram.tolist(),
+                    "bins": [round(float(edge), 1) for edge in SIMILARITY_BINS],
+                },
+            }
@@ -11,5 +11,9 @@ class GenerationConfig:
     model: str = "gpt-4o"
     temperature: float = 0.95
     max_output_tokens: int = 800
+    context_token_budget: int = 1200
+    max_lyric_words: int = 320
+    max_regenerations: int = 2
     output_path: Path = Path("./data/generated_lyrics.json")
     questions_path: Path = Path("./data/questions.json")
+    report_path: Path = Path("./data/generation_report.json")
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CHARS_PER_TOKEN = 4
+NGRAM_SIZE = 3
+MIN_MATCH_SCORE = 0.6
+MIN_SNIPPET_TOKENS = 24
+MIN_EXCERPT_TOKENS = 64
+QUESTION_BUDGET_SHARE = 0.25
+
+_NORMALIZE_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_TITLE_RE = re.compile(r"^\W*title\s*:", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Function words and lyric-question phrasing that say nothing about the topic.
+_QUESTION_STOPWORDS = frozenset(
+    "a about again also an and any anything are as at be bit by can could did do does"
+    " elaborate else explain for from has have how i in is it its just line lines"
+    " lyric lyrics me mean meaning more my of on or please really so song tell than"
+    " that the then there this though to was were what when where which who why will"
+    " with would you your".split()
+)
+# A label line is only the section name, an optional number and an optional
+# parenthetical ("**Verse 2:**", "[Chorus (x2)]"); "Bridge over the river" is lyrics.
+_SECTION_RE = re.compile(
+    r"^(intro|verse|pre ?chorus|chorus|post ?chorus|hook|refrain|bridge|outro)(?: \d+)?$"
+)
+_PARENTHETICAL_RE = re.compile(r"\([^)]*\)")
+
+
+@dataclass(frozen=True)
+class ExcerptMatch:
+    """Location of a user excerpt inside the song lyrics (line indices, inclusive)."""
+
+    start: int
+    end: int
+    score: float
+    text: str
+    section: str
+
+
+@dataclass
+class PackedContext:
+    """Prompt-ready context trimmed to fit a token budget."""
+
+    excerpt: str
+    section: str = ""
+    search_results: List[Dict[str, str]] = field(default_factory=list)
+    match: Optional[ExcerptMatch] = None
+    dropped_results: int = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim ``text`` on a word boundary so it fits within ``max_tokens``."""
+
+    if max_tokens <= 0:
+        return ""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[: max(limit - 1, 0)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + "…"
+
+
+def _normalize(text: str) -> str:
+    text = _NORMALIZE_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE) -> set[str]:
+    normalized = _normalize(text)
+    if not normalized:
+        return set()
+    if len(normalized) <= n:
+        return {normalized}
+    return {normalized[i : i + n] for i in range(len(normalized) - n + 1)}
+
+
+def section_label(line: str) -> Optional[str]:
+    """Return the section name (``verse``, ``chorus``...) if ``line`` is a label."""
+
+    found = _SECTION_RE.match(_normalize(_PARENTHETICAL_RE.sub(" ", line)))
+    return found.group(1).replace(" ", "-") if found else None
+
+
+def stem_word(word: str) -> str:
+    """Strip a common English suffix so "charted" and "charts" match "chart"."""
+
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def content_words(text: str) -> set[str]:
+    """Stemmed words of ``text`` that carry its topic, without question phrasing."""
+
+    return {
+        stem_word(word)
+        for word in _WORD_RE.findall(text.lower())
+        if word not in _QUESTION_STOPWORDS
+    }
+
+
+def _is_section_header(line: str) -> bool:
+    return section_label(line) is not None
+
+
+def _lyric_body(text: str) -> str:
+    return _normalize(
+        "\n".join(line for line in text.splitlines() if not _is_section_header(line))
+    )
+
+
+def _section_bounds(lines: Sequence[str], start: int, end: int) -> Tuple[int, int]:
+    """Expand ``[start, end]`` to the enclosing labelled section or stanza."""
+
+    has_headers = any(_is_section_header(line) for line in lines)
+
+    def is_boundary(idx: int) -> bool:
+        if has_headers:
+            return _is_section_header(lines[idx])
+        return not lines[idx].strip()
+
+    top = start
+    while top > 0 and not is_boundary(top):
+        top -= 1
+    if not has_headers and not lines[top].strip():
+        top += 1
+
+    bottom = end
+    while bottom + 1 < len(lines) and not is_boundary(bottom + 1):
+        bottom += 1
+    return top, bottom
+
+
+def locate_excerpt(
+    lyrics: str,
+    excerpt: str,
+    *,
+    min_score: float = MIN_MATCH_SCORE,
+) -> Optional[ExcerptMatch]:
+    """Find the lyric lines that best match ``excerpt`` using character n-grams.
+
+    Pasted excerpts rarely match the stored lyrics byte for byte (smart quotes,
+    dropped punctuation, typos), so a sliding window the size of the excerpt is
+    scored by how many of the excerpt's character trigrams it covers, with
+    Jaccard similarity breaking ties between equally covering windows.
+    """
+
+    excerpt_grams = _ngrams(excerpt)
+    if not excerpt_grams or not lyrics.strip():
+        return None
+
+    lines = lyrics.splitlines()
+    line_grams = [_ngrams(line) for line in lines]
+    content_idx = [
+        idx
+        for idx, grams in enumerate(line_grams)
+        if grams and not _is_section_header(lines[idx]) and not _TITLE_RE.match(lines[idx])
+    ]
+    if not content_idx:
+        return None
+
+    window = max(1, min(sum(1 for line in excerpt.splitlines() if line.strip()), len(content_idx)))
+    best: Optional[Tuple[float, float, int, int]] = None
+    for pos in range(len(content_idx) - window + 1):
+        span = content_idx[pos : pos + window]
+        grams: set[str] = set().union(*(line_grams[idx] for idx in span))
+        overlap = len(excerpt_grams & grams)
+        if not overlap:
+            continue
+        coverage = overlap / len(excerpt_grams)
+        jaccard = overlap / len(excerpt_grams | grams)
+        if best is None or (coverage, jaccard) > best[:2]:
+            best = (coverage, jaccard, span[0], span[-1])
+
+    if best is None or best[0] < min_score:
+        return None
+
+    score, _, start, end = best
+    top, bottom = _section_bounds(lines, start, end)
+    return ExcerptMatch(
+        start=start,
+        end=end,
+        score=round(score, 3),
+        text="\n".join(lines[start : end + 1]).strip(),
+        section="\n".join(lines[top : bottom + 1]).strip(),
+    )
+
+
+def rank_search_results(
+    results: Iterable[Dict[str, str]],
+    query: str,
+) -> List[Dict[str, str]]:
+    """Order search results by n-gram overlap with ``query`` (stable for ties)."""
+
+    query_grams = _ngrams(query)
+    scored = []
+    for idx, result in enumerate(results):
+        grams = _ngrams(f"{result.get('title', '')} {result.get('snippet', '')}")
+        score = len(query_grams & grams) / len(query_grams | grams) if grams else 0.0
+        scored.append((-score, idx, result))
+    scored.sort(key=lambda item: (item[0], item[1]))
+    return [result for _, _, result in scored]
+
+
+def format_search_result(idx: int, result: Dict[str, str]) -> str:
+    return f"Result {idx}: {result['title']}\nURL: {result['url']}\nSnippet: {result['snippet']}"
+
+
+def pack_context(
+    *,
+    lyrics: str,
+    excerpt: str,
+    question: str,
+    search_results: Sequence[Dict[str, str]],
+    budget: int,
+) -> PackedContext:
+    """Fit excerpt, surrounding section and search snippets into ``budget`` tokens.
+
+    ``budget`` covers only the variable context; the caller accounts for the
+    fixed instructions and metadata. The excerpt takes priority, followed by the
+    matched section, then snippets in relevance order (the last one that does not
+    fit whole is trimmed if enough room remains).
+
+    The excerpt is never dropped: an oversized paste is replaced by the matched
+    lyric lines, which are kept even if they alone exceed ``budget``, and an
+    unmatched one is cut to at least ``MIN_EXCERPT_TOKENS``.
+    """
+
+    remaining = max(budget, 0)
+    match = locate_excerpt(lyrics, excerpt) if excerpt.strip() else None
+
+    packed_excerpt = excerpt.strip()
+    if estimate_tokens(packed_excerpt) > remaining:
+        if match is not None:
+            packed_excerpt = match.text
+        else:
+            packed_excerpt = truncate_to_tokens(
+                packed_excerpt, max(remaining, MIN_EXCERPT_TOKENS)
+            )
+    remaining -= estimate_tokens(packed_excerpt)
+
+    section = ""
+    if match is not None and _lyric_body(match.section) != _lyric_body(match.text):
+        if estimate_tokens(match.section) <= remaining:
+            section = match.section
+            remaining -= estimate_tokens(section)
+
+    packed_results: List[Dict[str, str]] = []
+    ranked = rank_search_results(search_results, f"{question} {packed_excerpt}")
+    for result in ranked:
+        cost = estimate_tokens(format_search_result(len(packed_results) + 1, result)) + 1
+        if cost <= remaining:
+            packed_results.append(result)
+            remaining -= cost
+            continue
+        overhead = cost - estimate_tokens(result.get("snippet", ""))
+        room = remaining - overhead
+        if room >= MIN_SNIPPET_TOKENS:
+            trimmed = dict(result, snippet=truncate_to_tokens(result.get("snippet", ""), room))
+            packed_results.append(trimmed)
+            remaining -= estimate_tokens(format_search_result(len(packed_results), trimmed)) + 1
+        break
+
+    return PackedContext(
+        excerpt=packed_excerpt,
+        section=section,
+        search_results=packed_results,
+        match=match,
+        dropped_results=len(search_results) - len(packed_results),
+    )
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from openai import BadRequestError, NotFoundError, OpenAI
+
+from .cache import SemanticAnswerCache
+from .config import GenerationConfig
+from .context import content_words, estimate_tokens, format_search_result, truncate_to_tokens
+from .qa import QA_SYSTEM_PROMPT, answer_question, input_tokens_used, search_song_context
+
+FOLLOW_UP_NEW_WORD_SHARE = 0.5
+SUMMARY_TURNS = 3
+SUMMARY_ANSWER_TOKENS = 80
+SEARCH_CUES = ("search", "source", "interview", "online", "released", "news", "who wrote")
+
+
+def _is_stale_response_error(exc: Exception) -> bool:
+    """True when the API rejected ``previous_response_id`` (expired or never stored)."""
+
+    return getattr(exc, "param", None) == "previous_response_id" or (
+        getattr(exc, "code", None) == "previous_response_not_found"
+    )
+
+
+@dataclass(frozen=True)
+class QATurn:
+    """One question/answer exchange within a session."""
+
+    question: str
+    answer: str
+    search_results: List[Dict[str, str]]
+    searched: bool
+    packed_tokens: int
+    cached: bool = False
+    input_tokens: Optional[int] = None
+
+
+@dataclass
+class QASession:
+    """Multi-turn Q&A about a single excerpt that reuses earlier context.
+
+    The first question goes through :func:`answer_question` (and ``cache``, if
+    given). Follow-ups are chained to the previous response with
+    ``previous_response_id`` so the metadata, excerpt and earlier research are
+    not resent; when chaining is unavailable (or the first answer came from the
+    cache) a compact summary of the thread is sent instead. A new web search
+    only runs when the follow-up is not covered by what the session already
+    knows.
+    """
+
+    song: Mapping[str, Any]
+    excerpt: str
+    config: GenerationConfig = field(default_factory=GenerationConfig)
+    allow_web: bool = True
+    max_search_results: int = 3
+    chain_responses: bool = True
+    cache: Optional[SemanticAnswerCache] = None
+    turns: List[QATurn] = field(default_factory=list)
+    search_results: List[Dict[str, str]] = field(default_factory=list)
+    response_id: Optional[str] = None
+
+    def matches(self, song: Mapping[str, Any], excerpt: str) -> bool:
+        """True when a new question targets the same song and excerpt."""
+
+        return self.song.get("title") == song.get("title") and (
+            self.excerpt.strip() == excerpt.strip()
+        )
+
+    def needs_search(self, question: str) -> bool:
+        """Decide whether a follow-up requires fresh web results.
+
+        A follow-up searches when it asks for outside sources, or when at least
+        ``FOLLOW_UP_NEW_WORD_SHARE`` of its content words appear in neither the
+        excerpt, the earlier questions nor the earlier search results.
+        """
+
+        if not self.allow_web or not question.strip():
+            return False
+        if not self.turns:
+            return True
+        lowered = question.lower()
+        if any(cue in lowered for cue in SEARCH_CUES):
+            return True
+        words = content_words(question)
+        if not words:
+            return False
+        known = content_words(
+            "\n".join(
+                [self.excerpt]
+                + [turn.question for turn in self.turns]
+                + [f"{res['title']} {res['snippet']}" for res in self.search_results]
+            )
+        )
+        return len(words - known) / len(words) >= FOLLOW_UP_NEW_WORD_SHARE
+
+    def ask(self, client: OpenAI, question: str) -> Dict[str, Any]:
+        """Answer ``question`` in the context of the conversation so far."""
+
+        if not self.turns:
+            result = answer_question(
+                client,
+                self.config,
+                song=self.song,
+                excerpt=self.excerpt,
+                question=question,
+                allow_web=self.allow_web,
+                max_search_results=self.max_search_results,
+                cache=self.cache,
+            )
+            result["searched"] = (
+                not result["cached"] and self.allow_web and bool(question.strip())
+            )
+            self.search_results = list(result["search_results"])
+        else:
+            result = self._follow_up(client, question)
+
+        self.response_id = result.get("response_id")
+        self.turns.append(
+            QATurn(
+                question=question.strip(),
+                answer=result["answer"],
+                search_results=result["search_results"],
+                searched=result["searched"],
+                packed_tokens=result["packed_tokens"],
+                cached=result["cached"],
+                input_tokens=result.get("input_tokens"),
+            )
+        )
+        return result
+
+    def _follow_up(self, client: OpenAI, question: str) -> Dict[str, Any]:
+        new_results: List[Dict[str, str]] = []
+        search_error: Optional[str] = None
+        searched = self.needs_search(question)
+        if searched:
+            found, search_error = search_song_context(
+                self.song, question, max_results=self.max_search_results
+            )
+            known_urls = {res["url"] for res in self.search_results}
+            new_results = [res for res in found if res["url"] not in known_urls]
+            self.search_results.extend(new_results)
+
+        research = ""
+        if new_results:
+            offset = len(self.search_results) - len(new_results)
+            formatted = "\n\n".join(
+                format_search_result(offset + idx, res)
+                for idx, res in enumerate(new_results, start=1)
+            )
+            research = f"New external research results:\n{formatted}\n\n"
+        elif search_error:
+            research = f"Search failed: {search_error}\n\n"
+
+        response = None
+        if self.chain_responses and self.response_id:
+            messages = [
+                {
+                    "role": "user",
+                    "content": (
+                        f"Follow-up question about the same excerpt:\n{question.strip()}\n\n"
+                        f"{research}"
+                        "Answer in clear prose, building on your earlier answers."
+                    ),
+                }
+            ]
+            try:
+                response = self._create(
+                    client, messages, previous_response_id=self.response_id
+                )
+            except (BadRequestError, NotFoundError) as exc:
+                if not _is_stale_response_error(exc):
+                    raise
+                response = None
+        if response is None:
+            messages = [
+                {"role": "system", "content": QA_SYSTEM_PROMPT},
+                {"role": "user", "content": self._summary_prompt(question, research)},
+            ]
+            response = self._create(client, messages)
+
+        return {
+            "answer": response.output_text.strip(),
+            "search_results": new_results,
+            "search_error": search_error,
+            "packed_tokens": sum(estimate_tokens(msg["content"]) for msg in messages),
+            "input_tokens": input_tokens_used(response),
+            "excerpt_match": None,
+            "response_id": getattr(response, "id", None),
+            "searched": searched,
+            "cached": False,
+        }
+
+    def _create(self, client: OpenAI, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        return client.responses.create(
+            model=os.getenv("OPENAI_QA_MODEL", self.config.model),
+            temperature=min(self.config.temperature, 0.7),
+            max_output_tokens=min(self.config.max_output_tokens, 600),
+            input=messages,
+            **kwargs,
+        )
+
+    def _summary_prompt(self, question: str, research: str) -> str:
+        """Compact stand-in for the full thread when responses cannot be chained."""
+
+        history = "\n\n".join(
+            f"Q: {turn.question}\nA: {truncate_to_tokens(turn.answer, SUMMARY_ANSWER_TOKENS)}"
+            for turn in self.turns[-SUMMARY_TURNS:]
+        )
+        known = "; ".join(res["title"] for res in self.search_results) or "None"
+        return (
+            "You are LyricsGPT, continuing a conversation about a lyric excerpt.\n"
+            f"Song: {self.song.get('title', 'Unknown')}"
+            f" (theme: {self.song.get('theme', 'Unknown')};"
+            f" secret twist: {self.song.get('twist', 'Unknown')})\n\n"
+            "Lyric excerpt:\n"
+            f"{truncate_to_tokens(self.excerpt.strip(), 150) or 'No excerpt provided.'}\n\n"
+            f"Conversation so far:\n{history}\n\n"
+            f"Research already consulted: {known}\n\n"
+            f"{research}"
+            f"Follow-up question:\n{question.strip()}\n\n"
+            "Answer in clear prose, building on the earlier answers."
+        )
@@ -1,35 +1,61 @@
 from __future__ import annotations
 
+import math
 import os
-from typing import Iterable
+from collections import deque
+from dataclasses import replace
+from typing import Any, Iterable, Iterator, Optional, Tuple
 
 from openai import OpenAI
 
 from .config import GenerationConfig
 from .prompts import SongPrompt
+from .validation import QualityReport, feedback_for, is_truncated, validate_lyrics
 
+SONGWRITER_SYSTEM_PROMPT = (
+    "You are a platinum-selling songwriter blending poetic imagery,"
+    " irresistible hooks, and subtle puzzles."
+)
 
-def generate_lyrics(client: OpenAI, prompt: SongPrompt, config: GenerationConfig) -> str:
-    """Generate lyrics for a single prompt using the provided OpenAI client."""
 
-    response = client.responses.create(
+def _create_response(
+    client: OpenAI,
+    prompt: SongPrompt,
+    config: GenerationConfig,
+    *,
+    feedback: str = "",
+) -> Any:
+    user_prompt = prompt.format_prompt()
+    if feedback:
+        user_prompt = f"{user_prompt}\n{feedback}"
+    return client.responses.create(
         model=os.getenv("OPENAI_LYRICS_MODEL", config.model),
         temperature=config.temperature,
         max_output_tokens=config.max_output_tokens,
         input=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a platinum-selling songwriter blending poetic imagery,"
-                    " irresistible hooks, and subtle puzzles."
-                ),
-            },
-            {"role": "user", "content": prompt.format_prompt()},
+            {"role": "system", "content": SONGWRITER_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
         ],
     )
+
+
+def generate_lyrics(client: OpenAI, prompt: SongPrompt, config: GenerationConfig) -> str:
+    """Generate lyrics for a single prompt using the provided OpenAI client."""
+
+    response = _create_response(client, prompt, config)
     return response.output_text.strip()
 
 
+def _song_record(prompt: SongPrompt, lyrics: str) -> dict[str, str]:
+    return {
+        "title": prompt.title,
+        "theme": prompt.theme,
+        "vibe": prompt.vibe,
+        "twist": prompt.twist,
+        "lyrics": lyrics,
+    }
+
+
 def generate_batch(
     client: OpenAI,
     prompts: Iterable[SongPrompt],
@@ -37,16 +63,95 @@ def generate_batch(
 ) -> list[dict[str, str]]:
     """Generate lyrics for a collection of prompts and return structured records."""
 
-    songs: list[dict[str, str]] = []
-    for prompt in prompts:
-        lyrics = generate_lyrics(client, prompt, config)
-        songs.append(
-            {
-                "title": prompt.title,
-                "theme": prompt.theme,
-                "vibe": prompt.vibe,
-                "twist": prompt.twist,
-                "lyrics": lyrics,
-            }
+    return [
+        _song_record(prompt, generate_lyrics(client, prompt, config)) for prompt in prompts
+    ]
+
+
+def _retry_config(
+    config: GenerationConfig,
+    previous: GenerationConfig,
+    *,
+    attempt: int,
+    truncated: bool,
+) -> GenerationConfig:
+    """Cool the sampling down on each retry and grow the token cap after truncation.
+
+    The temperature steps down linearly from the base ``config`` to a floor of
+    0.5, and never rises above the base; the token cap builds on the
+    ``previous`` attempt so repeated truncations keep growing it.
+    """
+
+    max_output_tokens = previous.max_output_tokens
+    if truncated:
+        max_output_tokens = math.ceil(max_output_tokens * 1.5)
+    return replace(
+        previous,
+        temperature=min(
+            config.temperature, max(0.5, round(config.temperature - 0.15 * attempt, 2))
+        ),
+        max_output_tokens=max_output_tokens,
+    )
+
+
+def iter_validated_songs(
+    client: OpenAI,
+    prompts: Iterable[SongPrompt],
+    config: GenerationConfig,
+    report: QualityReport,
+) -> Iterator[Tuple[int, dict[str, str]]]:
+    """Yield ``(prompt_index, record)`` pairs as songs pass validation.
+
+    Each response is checked as soon as it arrives. Failing prompts go to the
+    back of the queue with corrective feedback and adjusted settings, so good
+    songs stream out immediately and only the failures are regenerated. After
+    ``config.max_regenerations`` retries the last attempt is yielded anyway and
+    listed under ``failed`` in ``report``.
+    """
+
+    queue = deque(
+        (index, prompt, config, 1, "") for index, prompt in enumerate(prompts)
+    )
+    while queue:
+        index, prompt, attempt_config, attempt, feedback = queue.popleft()
+        response = _create_response(client, prompt, attempt_config, feedback=feedback)
+        lyrics = response.output_text.strip()
+        truncated = is_truncated(response)
+        result = validate_lyrics(
+            lyrics, max_words=config.max_lyric_words, truncated=truncated
         )
-    return songs
+        report.record_attempt(result)
+
+        if not result.ok and attempt <= config.max_regenerations:
+            queue.append(
+                (
+                    index,
+                    prompt,
+                    _retry_config(
+                        config, attempt_config, attempt=attempt, truncated=truncated
+                    ),
+                    attempt + 1,
+                    feedback_for(result, max_words=config.max_lyric_words),
+                )
+            )
+            continue
+
+        report.record_final(prompt.title, result, attempts=attempt)
+        yield index, _song_record(prompt, lyrics)
+
+
+def generate_validated_batch(
+    client: OpenAI,
+    prompts: Iterable[SongPrompt],
+    config: GenerationConfig,
+    *,
+    report: Optional[QualityReport] = None,
+) -> Tuple[list[dict[str, str]], QualityReport]:
+    """Generate, validate and selectively regenerate songs, keeping prompt order.
+
+    Outcomes are recorded in ``report`` when given, otherwise in a new one.
+    """
+
+    report = QualityReport() if report is None else report
+    by_index = dict(iter_validated_songs(client, prompts, config, report))
+    return [by_index[index] for index in sorted(by_index)], report
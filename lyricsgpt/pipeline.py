@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Optional
 
 from openai import OpenAI
 
 from .config import GenerationConfig
-from .generator import generate_batch
+from .generator import generate_batch, generate_validated_batch
 from .prompts import SongPrompt
-from .storage import save_songs_to_json
+from .storage import save_report_to_json, save_songs_to_json
+from .validation import QualityReport
 
 
 def create_lyrics_dataset(
@@ -16,10 +17,24 @@ def create_lyrics_dataset(
     config: GenerationConfig,
     *,
     persist: bool = True,
+    validate: bool = True,
+    report: Optional[QualityReport] = None,
 ) -> list[dict[str, str]]:
-    """Generate lyrics for prompts and optionally persist the dataset."""
+    """Generate lyrics for prompts and optionally persist the dataset.
+
+    With ``validate`` each song is checked and only failing prompts are
+    regenerated. The run's quality report is filled into ``report`` when given
+    (whether or not the dataset is persisted) and, with ``persist``, written to
+    ``config.report_path``.
+    """
+
+    if validate:
+        dataset, report = generate_validated_batch(client, prompts, config, report=report)
+    else:
+        dataset = generate_batch(client, prompts, config)
 
-    dataset = generate_batch(client, prompts, config)
     if persist:
         save_songs_to_json(dataset, config.output_path)
+        if validate:
+            save_report_to_json(report.to_dict(), config.report_path)
     return dataset
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 from openai import OpenAI
 
+from .cache import SemanticAnswerCache
 from .config import GenerationConfig
+from .context import (
+    QUESTION_BUDGET_SHARE,
+    PackedContext,
+    estimate_tokens,
+    format_search_result,
+    pack_context,
+    truncate_to_tokens,
+)
 
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
@@ -53,42 +62,31 @@ def perform_web_search(query: str, max_results: int = 3) -> List[Dict[str, str]]
     return results
 
 
+QA_SYSTEM_PROMPT = (
+    "You are a precise and empathetic lyric analyst. Cite insights"
+    " from the provided excerpt or research snippets when possible."
+)
+
+
 def _format_search_results(results: Iterable[Dict[str, str]]) -> str:
-    formatted = []
-    for idx, result in enumerate(results, start=1):
-        formatted.append(
-            f"Result {idx}: {result['title']}\nURL: {result['url']}\nSnippet: {result['snippet']}"
-        )
+    formatted = [
+        format_search_result(idx, result) for idx, result in enumerate(results, start=1)
+    ]
     return "\n\n".join(formatted) if formatted else "None"
 
 
-def answer_question(
-    client: OpenAI,
-    config: GenerationConfig,
+def _build_user_prompt(
+    song: Mapping[str, Any],
+    question: str,
     *,
-    song: Dict[str, Any],
     excerpt: str,
-    question: str,
-    allow_web: bool = True,
-    max_search_results: int = 3,
-) -> Dict[str, Any]:
-    """Return an LLM-generated answer with optional web context."""
-
-    search_results: List[Dict[str, str]] = []
-    search_error: str | None = None
-
-    if allow_web and question.strip():
-        query = f"{song['title']} lyrics {question}" if song.get("title") else question
-        try:
-            search_results = perform_web_search(query, max_results=max_search_results)
-        except Exception as exc:  # pragma: no cover - network issues
-            search_error = str(exc)
-
-    external_context = _format_search_results(search_results)
-    if search_error:
-        external_context = f"Search failed: {search_error}"
-
-    user_prompt = (
+    section: str,
+    external_context: str,
+) -> str:
+    section_block = (
+        f"Surrounding section of the song:\n{section}\n\n" if section else ""
+    )
+    return (
         "You are LyricsGPT, an assistant that explains song lyrics.\n"
         "Your answer will go directly to the user, so be helpful, concise and to the point."
         "Use the provided song metadata, excerpt, and any external research to"
@@ -101,7 +99,8 @@ def answer_question(
         f"- Vibe: {song.get('vibe', 'Unknown')}\n"
         f"- Secret twist: {song.get('twist', 'Unknown')}\n\n"
         "Lyric excerpt:\n"
-        f"{excerpt.strip() or 'No excerpt provided.'}\n\n"
+        f"{excerpt or 'No excerpt provided.'}\n\n"
+        f"{section_block}"
         "User question:\n"
         f"{question.strip()}\n\n"
         "External research results:\n"
@@ -109,24 +108,124 @@ def answer_question(
         "Now provide your answer in clear prose."
     )
 
+
+def search_song_context(
+    song: Mapping[str, Any],
+    question: str,
+    *,
+    max_results: int = 3,
+) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """Run the supplementary web search for a question, returning (results, error)."""
+
+    query = f"{song['title']} lyrics {question}" if song.get("title") else question
+    try:
+        return perform_web_search(query, max_results=max_results), None
+    except Exception as exc:  # pragma: no cover - network issues
+        return [], str(exc)
+
+
+def input_tokens_used(response: Any) -> Optional[int]:
+    """Input tokens billed for ``response``, including any chained earlier turns."""
+
+    return getattr(getattr(response, "usage", None), "input_tokens", None)
+
+
+def answer_question(
+    client: OpenAI,
+    config: GenerationConfig,
+    *,
+    song: Mapping[str, Any],
+    excerpt: str,
+    question: str,
+    allow_web: bool = True,
+    max_search_results: int = 3,
+    token_budget: Optional[int] = None,
+    cache: Optional[SemanticAnswerCache] = None,
+) -> Dict[str, Any]:
+    """Return an LLM-generated answer with optional web context.
+
+    The prompt is packed to ``token_budget`` (defaults to
+    ``config.context_token_budget``): the excerpt is located in the song lyrics,
+    its surrounding section is added when it fits, and search snippets are
+    ranked and trimmed. The question itself is cut to ``QUESTION_BUDGET_SHARE``
+    of the budget. ``packed_tokens`` in the result is the estimated prompt size
+    actually sent; ``input_tokens`` is the billed count from the API usage, when
+    reported.
+
+    With a ``cache``, a paraphrase of an earlier question about the same excerpt
+    is answered from the stored result (``cached`` is then ``True``). Answers
+    with and without web research are cached separately, and a cached result
+    has no ``response_id`` to chain a follow-up onto.
+    """
+
+    if cache is not None:
+        hit = cache.lookup(song.get("title", ""), excerpt, question, allow_web=allow_web)
+        if hit is not None:
+            return {
+                **hit.result,
+                "response_id": None,
+                "cached": True,
+                "cache_similarity": hit.similarity,
+            }
+
+    search_results: List[Dict[str, str]] = []
+    search_error: str | None = None
+
+    if allow_web and question.strip():
+        search_results, search_error = search_song_context(
+            song, question, max_results=max_search_results
+        )
+
+    # Fixed instructions, metadata and question are always sent; whatever is
+    # left of the budget goes to the excerpt, its section and the snippets.
+    budget = config.context_token_budget if token_budget is None else token_budget
+    prompt_question = truncate_to_tokens(
+        question.strip(), max(int(budget * QUESTION_BUDGET_SHARE), 1)
+    )
+    fixed_tokens = estimate_tokens(QA_SYSTEM_PROMPT) + estimate_tokens(
+        _build_user_prompt(song, prompt_question, excerpt="", section="", external_context="")
+    )
+    packed: PackedContext = pack_context(
+        lyrics=song.get("lyrics", ""),
+        excerpt=excerpt,
+        question=question,
+        search_results=search_results,
+        budget=budget - fixed_tokens,
+    )
+
+    external_context = _format_search_results(packed.search_results)
+    if search_error:
+        external_context = f"Search failed: {search_error}"
+
+    user_prompt = _build_user_prompt(
+        song,
+        prompt_question,
+        excerpt=packed.excerpt,
+        section=packed.section,
+        external_context=external_context,
+    )
+    packed_tokens = estimate_tokens(QA_SYSTEM_PROMPT) + estimate_tokens(user_prompt)
+
     response = client.responses.create(
         model=os.getenv("OPENAI_QA_MODEL", config.model),
         temperature=min(config.temperature, 0.7),
         max_output_tokens=min(config.max_output_tokens, 600),
         input=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a precise and empathetic lyric analyst. Cite insights"
-                    " from the provided excerpt or research snippets when possible."
-                ),
-            },
+            {"role": "system", "content": QA_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
     )
 
-    return {
+    result = {
         "answer": response.output_text.strip(),
-        "search_results": search_results,
+        "search_results": packed.search_results,
         "search_error": search_error,
+        "packed_tokens": packed_tokens,
+        "input_tokens": input_tokens_used(response),
+        "excerpt_match": packed.match,
+        "response_id": getattr(response, "id", None),
+        "cached": False,
     }
+    if cache is not None and search_error is None:
+        cache.store(song.get("title", ""), excerpt, question, result, allow_web=allow_web)
+    return result
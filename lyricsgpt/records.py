@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import re
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Union,
+    overload,
+)
+
+METADATA_FIELDS = ("title", "theme", "vibe", "twist")
+SONG_FIELDS = METADATA_FIELDS + ("lyrics",)
+
+CHUNK_CHARS = 1 << 16
+
+_WHITESPACE_RE = re.compile(r"\s*")
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _JSONStreamReader:
+    """Decode JSON values from a text stream read in ``CHUNK_CHARS`` pieces."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self._stream.read(CHUNK_CHARS)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or ``""`` at the end of the stream."""
+
+        while True:
+            self._pos = _WHITESPACE_RE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos : self._pos + 1]
+
+    def advance(self) -> None:
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return item
+
+
+def _iter_json_array(stream: TextIO, source: Path) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array one at a time."""
+
+    reader = _JSONStreamReader(stream)
+    if reader.peek() != "[":
+        raise ValueError(f"Expected a JSON list of songs in {source}")
+    reader.advance()
+    if reader.peek() == "]":
+        reader.advance()
+    else:
+        while True:
+            yield reader.value()
+            separator = reader.peek()
+            reader.advance()
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Malformed JSON list in {source}")
+    if reader.peek():
+        raise ValueError(f"Unexpected data after the song list in {source}")
+
+
+class SongRecord(Mapping):
+    """A song with ``__slots__`` storage that still reads like the old dict.
+
+    Metadata strings are interned, so the theme/vibe/twist shared by many
+    songs are stored once. Lyrics either live on the record or, for records
+    owned by a :class:`SongCatalog`, are decoded from the catalog's UTF-8
+    buffer on each access. ``record["title"]``, ``record.get(...)``,
+    ``dict(record)`` and ``==`` against a dict all behave as before.
+    """
+
+    __slots__ = ("title", "theme", "vibe", "twist", "_lyrics", "_catalog", "_index", "_extra")
+
+    def __init__(
+        self,
+        title: str,
+        theme: str = "",
+        vibe: str = "",
+        twist: str = "",
+        lyrics: Optional[str] = None,
+        *,
+        catalog: Optional["SongCatalog"] = None,
+        index: int = -1,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.title = _intern(title)
+        self.theme = _intern(theme)
+        self.vibe = _intern(vibe)
+        self.twist = _intern(twist)
+        self._lyrics = lyrics
+        self._catalog = catalog
+        self._index = index
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SongRecord":
+        extra = {key: value for key, value in data.items() if key not in SONG_FIELDS}
+        return cls(
+            data.get("title", ""),
+            data.get("theme", ""),
+            data.get("vibe", ""),
+            data.get("twist", ""),
+            data.get("lyrics", ""),
+            extra=extra,
+        )
+
+    @property
+    def lyrics(self) -> str:
+        if self._catalog is not None:
+            return self._catalog.lyrics_at(self._index)
+        return self._lyrics or ""
+
+    def __getitem__(self, key: str) -> Any:
+        if key in METADATA_FIELDS:
+            return getattr(self, key)
+        if key == "lyrics":
+            return self.lyrics
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from SONG_FIELDS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(SONG_FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"SongRecord(title={self.title!r}, theme={self.theme!r}, vibe={self.vibe!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+
+class SongCatalog(Sequence):
+    """Read-only collection of :class:`SongRecord` with columnar lyric storage.
+
+    All lyric bodies are concatenated into one UTF-8 buffer indexed by an
+    ``array`` of offsets, which avoids a ``str`` object (and its header and
+    UCS-2 widening for curly quotes) per song. With ``compress`` each body is
+    zlib-compressed on its own; repeated choruses make that roughly halve the
+    buffer for ~10µs per lyric access. A lyric string only exists while a
+    caller is using it.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Mapping[str, Any]] = (),
+        *,
+        compress: bool = True,
+    ) -> None:
+        self._compress = compress
+        self._records: List[SongRecord] = []
+        self._offsets = array("Q", [0])
+        self._buffer = bytearray()
+        self._by_title: Dict[str, SongRecord] = {}
+        for record in records:
+            self._append(record)
+
+    @classmethod
+    def from_json(cls, path: Path, *, compress: bool = True) -> "SongCatalog":
+        """Parse a dataset file (a JSON list of song objects) into a catalog.
+
+        The file is read in chunks and each song is compacted before the next
+        is decoded, so neither the file text nor the full list of dicts is ever
+        held in memory. Nested objects inside a song are kept as-is in its
+        extra fields.
+        """
+
+        catalog = cls(compress=compress)
+        with path.open(encoding="utf-8") as stream:
+            for index, song in enumerate(_iter_json_array(stream, path)):
+                if not isinstance(song, Mapping):
+                    raise ValueError(f"Song {index} in {path} is not a JSON object")
+                catalog._append(song)
+        return catalog
+
+    def _append(self, data: Mapping[str, Any]) -> SongRecord:
+        if isinstance(data, SongRecord):
+            data = data.to_dict()
+        record = SongRecord.from_dict(data)
+        if record._lyrics:
+            encoded = record._lyrics.encode("utf-8")
+            self._buffer += zlib.compress(encoded) if self._compress else encoded
+        self._offsets.append(len(self._buffer))
+        record._lyrics = None
+        record._catalog = self
+        record._index = len(self._records)
+        self._records.append(record)
+        self._by_title.setdefault(record.title.casefold(), record)
+        return record
+
+    def lyrics_at(self, index: int) -> str:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        if start == end:
+            return ""
+        encoded = self._buffer[start:end]
+        return (zlib.decompress(encoded) if self._compress else encoded).decode("utf-8")
+
+    def by_title(self, title: str) -> Optional[SongRecord]:
+        """Case-insensitive lookup of a song by title."""
+
+        return self._by_title.get(title.strip().casefold())
+
+    def titles(self) -> List[str]:
+        return [record.title for record in self._records]
+
+    @overload
+    def __getitem__(self, index: int) -> SongRecord: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[SongRecord]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SongRecord, List[SongRecord]]:
+        return self._records[index]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[SongRecord]:
+        return iter(self._records)
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlparse
+
+from .cache import SemanticAnswerCache
+from .config import GenerationConfig
+from .qa import answer_question
+from .records import SongCatalog, SongRecord
+
+MAX_BODY_BYTES = 64 * 1024
+IDLE_TIMEOUT = 30.0
+# The secret twist is never exposed, matching what the app shows.
+SONG_SUMMARY_FIELDS = ("title", "theme", "vibe")
+
+
+class BadRequestError(ValueError):
+    """Raised when an API payload is missing or has invalid fields."""
+
+
+class SongNotFoundError(LookupError):
+    """Raised when a request names a song that is not in the dataset."""
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the worker pool and its queue are both saturated."""
+
+
+class ShuttingDownError(RuntimeError):
+    """Raised when work is submitted after shutdown has started."""
+
+
+class WorkerPool:
+    """Thread pool with a bounded backlog: ``workers`` running plus ``queue_size`` waiting."""
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lyricsgpt")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._closed = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._closed:
+                raise ShuttingDownError("Server is shutting down")
+            if not self._slots.acquire(blocking=False):
+                self._rejected += 1
+                raise QueueFullError("Worker queue is full")
+            self._pending += 1
+            future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for queued and running jobs to finish."""
+
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True)
+
+
+@dataclass
+class _FakeResponse:
+    output_text: str
+    id: str
+    status: str = "completed"
+
+
+@dataclass
+class FakeOpenAI:
+    """Offline stand-in for ``OpenAI`` that sleeps ``latency`` seconds per call.
+
+    Only ``client.responses.create`` is implemented, which is all the
+    package uses; it lets the API server be load-tested without spending tokens.
+    """
+
+    latency: float = 0.2
+    _ids: Any = field(default_factory=count, repr=False)
+
+    @property
+    def responses(self) -> "FakeOpenAI":
+        return self
+
+    def create(self, **kwargs: Any) -> _FakeResponse:
+        time.sleep(self.latency)
+        question = kwargs["input"][-1]["content"].rsplit("User question:\n", 1)[-1]
+        answer = f"(fake answer) {question.splitlines()[0] if question else ''}".strip()
+        return _FakeResponse(output_text=answer, id=f"fake_{next(self._ids)}")
+
+
+@dataclass
+class LyricsAPI:
+    """Process-wide state shared by every request: one client, dataset, cache and pool."""
+
+    client: Any
+    songs: SongCatalog
+    config: GenerationConfig = field(default_factory=GenerationConfig)
+    cache: Optional[SemanticAnswerCache] = field(default_factory=SemanticAnswerCache)
+    pool: WorkerPool = field(default_factory=lambda: WorkerPool(workers=4, queue_size=16))
+    allow_web: bool = True
+    request_timeout: float = 60.0
+
+    def list_songs(self) -> List[Dict[str, str]]:
+        return [{key: song.get(key, "") for key in SONG_SUMMARY_FIELDS} for song in self.songs]
+
+    def get_song(self, title: str) -> Optional[SongRecord]:
+        return self.songs.by_title(title)
+
+    def song_details(self, title: str) -> Optional[Dict[str, str]]:
+        """Public fields and lyrics of a song, or ``None`` if it is unknown."""
+
+        song = self.get_song(title)
+        if song is None:
+            return None
+        return {**{key: song.get(key, "") for key in SONG_SUMMARY_FIELDS}, "lyrics": song.lyrics}
+
+    def answer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate an answer request and run it on the worker pool."""
+
+        title = payload.get("title")
+        question = payload.get("question")
+        if not isinstance(title, str) or not isinstance(question, str) or not question.strip():
+            raise BadRequestError("'title' and a non-empty 'question' are required")
+        song = self.get_song(title)
+        if song is None:
+            raise SongNotFoundError(f"Unknown song: {title}")
+        allow_web = payload.get("allow_web", True)
+        if not isinstance(allow_web, bool):
+            raise BadRequestError("'allow_web' must be true or false")
+        max_search_results = payload.get("max_search_results", 3)
+        if isinstance(max_search_results, bool) or not isinstance(max_search_results, int):
+            raise BadRequestError("'max_search_results' must be an integer")
+        excerpt = payload.get("excerpt", "")
+        if not isinstance(excerpt, str):
+            raise BadRequestError("'excerpt' must be a string")
+
+        future = self.pool.submit(
+            answer_question,
+            self.client,
+            self.config,
+            song=song,
+            excerpt=excerpt,
+            question=question,
+            allow_web=self.allow_web and allow_web,
+            max_search_results=min(max(max_search_results, 1), 5),
+            cache=self.cache,
+        )
+        result = future.result(timeout=self.request_timeout)
+        match = result.get("excerpt_match")
+        return {**result, "excerpt_match": asdict(match) if match is not None else None}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "songs": len(self.songs),
+            "pool": self.pool.stats(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+class LyricsRequestHandler(BaseHTTPRequestHandler):
+    """Routes: ``GET /health``, ``GET /stats``, ``GET /songs``, ``GET /songs/<title>``,
+    ``POST /answer``."""
+
+    server: "LyricsHTTPServer"
+    protocol_version = "HTTP/1.1"
+    timeout = IDLE_TIMEOUT  # drop keep-alive connections that stay silent
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path.rstrip("/")
+        api = self.server.api
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif path == "/stats":
+            self._send_json(HTTPStatus.OK, api.stats())
+        elif path == "/songs":
+            self._send_json(HTTPStatus.OK, {"songs": api.list_songs()})
+        elif path.startswith("/songs/"):
+            song = api.song_details(unquote(path[len("/songs/") :]))
+            if song is None:
+                self._send_error(HTTPStatus.NOT_FOUND, "Unknown song")
+            else:
+                self._send_json(HTTPStatus.OK, song)
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path.rstrip("/") != "/answer":
+            self.close_connection = True  # the unread body would corrupt keep-alive
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+
+        payload, error = self._read_json()
+        if error:
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, error)
+            return
+
+        try:
+            result = self.server.api.answer(payload)
+        except BadRequestError as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(exc))
+        except SongNotFoundError as exc:
+            self._send_error(HTTPStatus.NOT_FOUND, str(exc))
+        except QueueFullError as exc:
+            self._send_error(HTTPStatus.TOO_MANY_REQUESTS, str(exc), headers={"Retry-After": "1"})
+        except ShuttingDownError as exc:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+        except FutureTimeoutError:
+            self._send_error(HTTPStatus.GATEWAY_TIMEOUT, "Answer timed out")
+        except Exception as exc:  # pragma: no cover - upstream model failures
+            self._send_error(HTTPStatus.BAD_GATEWAY, f"Answer failed: {exc}")
+        else:
+            self._send_json(HTTPStatus.OK, result)
+
+    def _read_json(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            return {}, "Invalid Content-Length"
+        if length < 0:
+            return {}, "Invalid Content-Length"
+        if length > MAX_BODY_BYTES:
+            return {}, "Request body too large"
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return {}, "Body must be JSON"
+        if not isinstance(payload, dict):
+            return {}, "Body must be a JSON object"
+        return payload, None
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        body: Any,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(
+        self,
+        status: HTTPStatus,
+        message: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self._send_json(status, {"error": message}, headers=headers)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class LyricsHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP front end; model calls are bounded by ``api.pool``."""
+
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, address: Tuple[str, int], api: LyricsAPI, *, quiet: bool = False) -> None:
+        super().__init__(address, LyricsRequestHandler)
+        self.api = api
+        self.quiet = quiet
+        self._connections: Set[socket.socket] = set()
+        self._connections_lock = threading.Lock()
+
+    def finish_request(self, request: Any, client_address: Any) -> None:
+        with self._connections_lock:
+            self._connections.add(request)
+        try:
+            super().finish_request(request, client_address)
+        finally:
+            with self._connections_lock:
+                self._connections.discard(request)
+
+    def graceful_shutdown(self) -> None:
+        """Stop accepting connections, close idle keep-alives, then drain the worker pool.
+
+        Open connections are shut down for reading only: a handler waiting for
+        the next request sees EOF and exits, while one that is mid-request can
+        still write its response. Must not be called from the thread running
+        ``serve_forever``.
+        """
+
+        self.shutdown()
+        with self._connections_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        self.api.pool.shutdown()
+        self.server_close()
@@ -2,17 +2,19 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Iterable, List, Dict
+from typing import Any, Iterable, List, Dict, Mapping
+
+from .records import SongCatalog
 
 
 def _ensure_parent(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def save_songs_to_json(records: Iterable[dict[str, str]], path: Path) -> None:
+def save_songs_to_json(records: Iterable[Mapping[str, str]], path: Path) -> None:
     """Persist generated lyrics to a JSON file."""
 
-    data = list(records)
+    data = [dict(record) for record in records]
     _ensure_parent(path)
     path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
 
@@ -24,3 +26,19 @@ def load_songs_from_json(path: Path) -> List[Dict[str, str]]:
         raise FileNotFoundError(f"Lyrics dataset not found at {path}")
 
     return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_song_catalog(path: Path, *, compress: bool = True) -> SongCatalog:
+    """Load a lyrics dataset into a memory-compact :class:`SongCatalog`."""
+
+    if not path.exists():
+        raise FileNotFoundError(f"Lyrics dataset not found at {path}")
+
+    return SongCatalog.from_json(path, compress=compress)
+
+
+def save_report_to_json(report: Dict[str, Any], path: Path) -> None:
+    """Persist a generation quality report next to the dataset."""
+
+    _ensure_parent(path)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
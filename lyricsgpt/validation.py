@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .context import section_label
+
+REQUIRED_SECTIONS: Tuple[str, ...] = ("verse", "chorus", "bridge", "outro")
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """Outcome of checking one generated song against the prompt's constraints."""
+
+    issues: Tuple[str, ...]
+    word_count: int
+    sections: Tuple[str, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def is_truncated(response: Any) -> bool:
+    """True when the Responses API stopped early (e.g. at ``max_output_tokens``)."""
+
+    return getattr(response, "status", None) == "incomplete"
+
+
+def count_lyric_words(lyrics: str) -> int:
+    """Count words in the lyric body, ignoring section labels."""
+
+    return sum(
+        len(line.split()) for line in lyrics.splitlines() if section_label(line) is None
+    )
+
+
+def validate_lyrics(
+    lyrics: str,
+    *,
+    max_words: int,
+    truncated: bool = False,
+    required_sections: Tuple[str, ...] = REQUIRED_SECTIONS,
+) -> ValidationResult:
+    """Check section structure, length and truncation of a generated song."""
+
+    sections = tuple(
+        label for label in (section_label(line) for line in lyrics.splitlines()) if label
+    )
+    word_count = count_lyric_words(lyrics)
+
+    issues: List[str] = []
+    if not lyrics.strip():
+        issues.append("empty")
+    if truncated:
+        issues.append("truncated")
+    missing = [name for name in required_sections if name not in sections]
+    if missing:
+        issues.append(f"missing_sections:{','.join(missing)}")
+    if word_count > max_words:
+        issues.append("too_long")
+
+    return ValidationResult(issues=tuple(issues), word_count=word_count, sections=sections)
+
+
+def feedback_for(result: ValidationResult, *, max_words: int) -> str:
+    """Turn validation issues into a corrective note appended to the retry prompt."""
+
+    notes = []
+    for issue in result.issues:
+        if issue == "truncated":
+            notes.append("The previous draft was cut off; finish every section.")
+        elif issue.startswith("missing_sections:"):
+            labels = ", ".join(
+                name.capitalize() for name in issue.split(":", 1)[1].split(",")
+            )
+            notes.append(f"Label every section; the previous draft lacked {labels}.")
+        elif issue == "too_long":
+            notes.append(
+                f"The previous draft ran {result.word_count} words; stay under"
+                f" {max_words} words."
+            )
+        elif issue == "empty":
+            notes.append("The previous draft was empty.")
+    return " ".join(notes)
+
+
+@dataclass
+class QualityReport:
+    """Per-run summary of validation outcomes and regeneration attempts."""
+
+    total: int = 0
+    passed_first_try: int = 0
+    passed_after_retry: int = 0
+    failed: List[str] = field(default_factory=list)
+    attempts: int = 0
+    issue_counts: Counter = field(default_factory=Counter)
+    word_counts: List[int] = field(default_factory=list)
+
+    def record_attempt(self, result: ValidationResult) -> None:
+        self.attempts += 1
+        self.issue_counts.update(issue.split(":", 1)[0] for issue in result.issues)
+
+    def record_final(
+        self, title: str, result: ValidationResult, *, attempts: int
+    ) -> None:
+        self.total += 1
+        self.word_counts.append(result.word_count)
+        if not result.ok:
+            self.failed.append(title)
+        elif attempts == 1:
+            self.passed_first_try += 1
+        else:
+            self.passed_after_retry += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        average_words: Optional[float] = (
+            round(sum(self.word_counts) / len(self.word_counts), 1)
+            if self.word_counts
+            else None
+        )
+        return {
+            "total": self.total,
+            "passed_first_try": self.passed_first_try,
+            "passed_after_retry": self.passed_after_retry,
+            "failed": list(self.failed),
+            "attempts": self.attempts,
+            "regenerations": self.attempts - self.total,
+            "issue_counts": dict(self.issue_counts),
+            "average_words": average_words,
+        }
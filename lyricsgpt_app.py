@@ -2,27 +2,33 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Dict, List
 
 import streamlit as st
 
 from lyricsgpt import (
     GenerationConfig,
+    QASession,
     SONG_PROMPTS,
-    answer_question,
+    SemanticAnswerCache,
+    SongCatalog,
     create_lyrics_dataset,
     get_client,
-    load_songs_from_json,
+    load_song_catalog,
 )
 
 APP_TITLE = "Use LLM to explore the lyrics of your favorite song"
 
 
-@st.cache_data(show_spinner=False)
-def load_dataset(path: Path) -> List[Dict[str, str]]:
+@st.cache_resource(show_spinner=False)
+def load_dataset(path: Path) -> SongCatalog:
     if path.exists():
-        return load_songs_from_json(path)
-    return []
+        return load_song_catalog(path)
+    return SongCatalog()
+
+
+@st.cache_resource(show_spinner=False)
+def answer_cache() -> SemanticAnswerCache:
+    return SemanticAnswerCache()
 
 
 def main() -> None:
@@ -73,9 +79,8 @@ def main() -> None:
         )
         return
 
-    song_titles = [record["title"] for record in dataset]
-    selected_title = st.selectbox("Select a song", song_titles)
-    selected_song = next(record for record in dataset if record["title"] == selected_title)
+    selected_title = st.selectbox("Select a song", dataset.titles())
+    selected_song = dataset.by_title(selected_title)
 
     st.markdown(f"## {selected_song['title']}")
     # st.write(f"**Theme:** {selected_song['theme']}")
@@ -113,34 +118,62 @@ def main() -> None:
     allow_web = col_options.checkbox("Allow supplementary web search", value=True)
     max_results = col_options.slider("Max search results", 1, 5, 3, disabled=not allow_web)
 
-    submit_clicked = col_submit.button("Get answer", disabled=not api_key)
+    session = st.session_state.get("qa_session")
+    if session is not None and not session.matches(selected_song, excerpt):
+        session = None
+    if col_submit.button("Start new thread", disabled=session is None):
+        session = None
+    st.session_state["qa_session"] = session
+
+    submit_label = "Ask follow-up" if session is not None else "Get answer"
+    submit_clicked = col_submit.button(submit_label, disabled=not api_key)
     if submit_clicked:
         if not question.strip():
             st.error("Please enter your question.")
         else:
-            client = get_client(api_key)
-            with st.spinner("Thinking..."):
-                result = answer_question(
-                    client,
-                    config,
+            if session is None:
+                session = QASession(
                     song=selected_song,
                     excerpt=excerpt,
-                    question=question,
-                    allow_web=allow_web,
-                    max_search_results=max_results,
+                    config=config,
+                    cache=answer_cache(),
                 )
-            st.subheader("Answer")
-            st.markdown(result["answer"])
-
-            if result.get("search_results"):
-                st.subheader("Research references")
-                for res in result["search_results"]:
-                    st.markdown(f"**{res['title']}** — {res['snippet']}")
-                    st.markdown(f"[{res['url']}]({res['url']})")
-                    st.write("")
-            elif result.get("search_error"):
+                st.session_state["qa_session"] = session
+            session.allow_web = allow_web
+            session.max_search_results = max_results
+            client = get_client(api_key)
+            with st.spinner("Thinking..."):
+                result = session.ask(client, question)
+            if result.get("search_error"):
                 st.warning(f"Web search failed: {result['search_error']}")
 
+    if session is not None and session.turns:
+        st.subheader("Conversation")
+        for turn in session.turns:
+            with st.chat_message("user"):
+                st.markdown(turn.question)
+            with st.chat_message("assistant"):
+                st.markdown(turn.answer)
+                if turn.cached:
+                    st.caption("Served from the answer cache")
+                else:
+                    size = (
+                        f"Input tokens: {turn.input_tokens}"
+                        if turn.input_tokens is not None
+                        else f"Payload size: ~{turn.packed_tokens} tokens"
+                    )
+                    st.caption(size + (" · web search" if turn.searched else ""))
+
+        if session.search_results:
+            st.subheader("Research references")
+            for res in session.search_results:
+                st.markdown(f"**{res['title']}** — {res['snippet']}")
+                st.markdown(f"[{res['url']}]({res['url']})")
+                st.write("")
+
+    with st.expander("Answer cache statistics"):
+        st.json(answer_cache().stats())
+
     st.info(f"Dataset source: `{dataset_path}`")
 
 
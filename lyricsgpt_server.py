@@ -0,0 +1,58 @@
+"""HTTP API entry point for song lookup and lyric Q&A."""
+
+from __future__ import annotations
+
+import argparse
+import signal
+import threading
+
+from lyricsgpt import GenerationConfig, get_client, load_song_catalog
+from lyricsgpt.server import FakeOpenAI, LyricsAPI, LyricsHTTPServer, WorkerPool
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent model calls")
+    parser.add_argument(
+        "--queue-size", type=int, default=16, help="requests allowed to wait before 429"
+    )
+    parser.add_argument("--no-web", action="store_true", help="disable supplementary web search")
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="answer with an offline fake model (implies --no-web) for load testing",
+    )
+    parser.add_argument("--fake-latency", type=float, default=0.2)
+    parser.add_argument("--quiet", action="store_true", help="disable per-request logging")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = GenerationConfig()
+    client = FakeOpenAI(latency=args.fake_latency) if args.fake else get_client()
+    api = LyricsAPI(
+        client=client,
+        songs=load_song_catalog(config.output_path),
+        config=config,
+        pool=WorkerPool(workers=args.workers, queue_size=args.queue_size),
+        allow_web=not (args.no_web or args.fake),
+    )
+    server = LyricsHTTPServer((args.host, args.port), api, quiet=args.quiet)
+
+    def handle_signal(signum: int, _frame: object) -> None:
+        print(f"Received signal {signum}; draining in-flight requests...")
+        # shutdown() blocks until serve_forever returns, so it cannot run here.
+        threading.Thread(target=server.graceful_shutdown).start()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    print(f"Serving {len(api.songs)} songs on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+from lyricsgpt import SemanticAnswerCache
+from lyricsgpt.cache import INITIAL_ROWS
+
+EXCERPT = "Fleet number thirteen keeps circling the block"
+
+
+def _cache_with(question: str, **kwargs) -> SemanticAnswerCache:
+    cache = SemanticAnswerCache(**kwargs)
+    cache.store("Rearview", EXCERPT, question, {"answer": question, "response_id": "resp_1"})
+    return cache
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("What does fleet number 13 mean?", "What is the meaning of the fleet number 13?"),
+        ("Who is the ex in this song?", "Who is the ex-lover referenced?"),
+        ("What does the red door symbolize?", "What does the red door represent?"),
+        ("What does this mean?", "What does this line mean?"),
+        ("What does fleet number 13 mean?", "What is the meaning of the 13 reference?"),
+        (
+            "Why does the singer feel sad in the chorus after the breakup?",
+            "Why does the singer feel so sad in the chorus after the breakup?",
+        ),
+    ],
+)
+def test_paraphrases_hit(stored, asked):
+    assert _cache_with(stored).lookup("Rearview", EXCERPT, asked) is not None
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("What does this mean?", "Who is 'you' referring to?"),
+        ("What does this mean?", "Who are you?"),
+        ("Why is the chorus sad?", "Why is the chorus happy?"),
+        ("What does fleet number 12 mean?", "What does fleet number 13 mean?"),
+        ("Who is the ex in this song?", "Why did the ex leave?"),
+        (
+            "Why does the singer feel sad in the chorus after the breakup?",
+            "Why does the singer feel happy in the chorus after the breakup?",
+        ),
+        (
+            "What does fleet number 13 in the second verse refer to?",
+            "What does fleet number 12 in the second verse refer to?",
+        ),
+        ("Why did the ex leave after the tour?", "Why didn't the ex leave after the tour?"),
+        ("What does the 13 reference mean?", "What does fleet number 13 mean?"),
+    ],
+)
+def test_different_questions_miss(stored, asked):
+    assert _cache_with(stored).lookup("Rearview", EXCERPT, asked) is None
+
+
+def test_hits_never_carry_a_response_id():
+    hit = _cache_with("What does this mean?").lookup("Rearview", EXCERPT, "What does this mean?")
+
+    assert hit.result == {"answer": "What does this mean?"}
+
+
+def test_answers_with_and_without_web_are_kept_apart():
+    cache = _cache_with("What does this mean?")
+
+    assert cache.lookup("Rearview", EXCERPT, "What does this mean?", allow_web=False) is None
+    assert cache.lookup("Rearview", EXCERPT, "What does this mean?", allow_web=True) is not None
+
+
+def test_global_cap_evicts_least_recently_used_song():
+    cache = SemanticAnswerCache(max_entries=2)
+    for title in ("A", "B"):
+        cache.store(title, EXCERPT, "Why thirteen?", {"answer": title})
+    cache.lookup("A", EXCERPT, "Why thirteen?")
+    cache.store("C", EXCERPT, "Why thirteen?", {"answer": "C"})
+
+    assert cache.lookup("B", EXCERPT, "Why thirteen?") is None
+    assert cache.lookup("A", EXCERPT, "Why thirteen?") is not None
+    stats = cache.stats()
+    assert (stats["entries"], stats["songs"], stats["evictions"]) == (2, 2, 1)
+
+
+def test_song_matrices_grow_with_entries():
+    cache = SemanticAnswerCache()
+    cache.store("A", EXCERPT, "Why thirteen?", {"answer": "a"})
+    small = cache.stats()["bytes"]
+    for idx in range(INITIAL_ROWS * 2):
+        cache.store("A", EXCERPT, f"Question {idx}?", {"answer": str(idx)})
+
+    assert small < cache.stats()["bytes"] <= 4 * small
+    assert cache.lookup("A", EXCERPT, "Why thirteen?").result == {"answer": "a"}
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+from lyricsgpt.context import locate_excerpt, section_label
+
+LYRICS = """**Title: Harbor Lights**
+
+**Verse 1**
+Bridge over the river, I wait for your call,
+The ferry keeps turning, it’s the last one of all.
+
+**Chorus**
+Hook, line and sinker, you reeled me back in,
+Harbor lights flicker where the night tides begin.
+
+**Verse 2**
+Salt on the window, your name on the glass,
+I count every sailboat and let the hours pass."""
+
+LINES = LYRICS.splitlines()
+
+
+@pytest.mark.parametrize(
+    "line, label",
+    [
+        ("**Pre-Chorus:**", "pre-chorus"),
+        ("[Chorus (x2)]", "chorus"),
+        ("Verse 2", "verse"),
+        ("Bridge over the river, I wait for your call,", None),
+        ("Hook, line and sinker", None),
+    ],
+)
+def test_section_label_only_accepts_bare_labels(line, label):
+    assert section_label(line) == label
+
+
+def test_typos_and_straight_quotes_still_match():
+    match = locate_excerpt(LYRICS, "The ferry keeps turnin, its the last one of al")
+
+    assert match is not None
+    assert LINES[match.start] == "The ferry keeps turning, it’s the last one of all."
+
+
+def test_lyric_line_that_starts_like_a_label_can_match():
+    match = locate_excerpt(LYRICS, "Bridge over the river, I wait for your call")
+
+    assert match is not None
+    assert match.start == LINES.index("Bridge over the river, I wait for your call,")
+    assert match.section.startswith("**Verse 1**")
+
+
+def test_excerpt_spanning_two_stanzas_covers_both():
+    excerpt = (
+        "Harbor lights flicker where the night tides begin.\n"
+        "Salt on the window, your name on the glass,"
+    )
+
+    match = locate_excerpt(LYRICS, excerpt)
+
+    assert match is not None
+    assert LINES[match.start].startswith("Harbor lights")
+    assert LINES[match.end].startswith("Salt on the window")
+
+
+def test_unrelated_excerpt_does_not_match():
+    assert locate_excerpt(LYRICS, "Quantum entropy of distant galaxies") is None
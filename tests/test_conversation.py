@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from openai import AuthenticationError, BadRequestError
+
+from lyricsgpt import QASession, SemanticAnswerCache, qa
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "generated_lyrics.json"
+SONGS = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+EXCERPT = "Thirteen miles to freedom, a hidden fleet I never knew"
+FLEET_RESULT = {
+    "title": "Fleet number 13 explained",
+    "url": "https://example.com/fleet",
+    "snippet": "Fans link the hidden fleet to the number thirteen.",
+}
+
+
+class ScriptedClient:
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls = []
+        self.responses = self
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.errors:
+            raise self.errors.pop(0)
+        usage = SimpleNamespace(input_tokens=500)
+        return SimpleNamespace(output_text="answer", id=f"resp_{len(self.calls)}", usage=usage)
+
+
+def _api_error(cls, param: str | None):
+    # Skip the HTTP plumbing of the real constructor; only param/code are read.
+    error = cls.__new__(cls)
+    error.param = param
+    error.code = None
+    return error
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(qa, "perform_web_search", lambda query, max_results: [FLEET_RESULT])
+    started = QASession(song=SONGS[0], excerpt=EXCERPT)
+    started.ask(ScriptedClient(), "What does the fleet number 13 mean?")
+    return started
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Has this song charted anywhere?",
+        "Is there a music video for it?",
+        "Who produced the record?",
+    ],
+)
+def test_follow_up_with_new_topic_searches(session, question):
+    assert session.needs_search(question)
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "And the hidden fleet I never knew?",
+        "Why thirteen though?",
+        "Can you explain that more?",
+    ],
+)
+def test_follow_up_on_known_topic_skips_search(session, question):
+    assert not session.needs_search(question)
+
+
+def test_chained_follow_up_reports_billed_input_tokens(session):
+    client = ScriptedClient()
+
+    result = session.ask(client, "Can you explain that more?")
+
+    assert client.calls[0]["previous_response_id"] == "resp_1"
+    assert result["input_tokens"] == 500
+    assert session.turns[-1].input_tokens == 500
+
+
+def test_stale_response_id_falls_back_to_summary(session):
+    client = ScriptedClient(_api_error(BadRequestError, "previous_response_id"))
+
+    session.ask(client, "Can you explain that more?")
+
+    assert len(client.calls) == 2
+    assert "previous_response_id" not in client.calls[1]
+
+
+def test_other_api_errors_are_not_retried(session):
+    client = ScriptedClient(_api_error(AuthenticationError, None))
+
+    with pytest.raises(AuthenticationError):
+        session.ask(client, "Can you explain that more?")
+    assert len(client.calls) == 1
+
+
+def test_cached_first_answer_is_not_labelled_as_searched(monkeypatch):
+    monkeypatch.setattr(qa, "perform_web_search", lambda query, max_results: [FLEET_RESULT])
+    cache = SemanticAnswerCache()
+    question = "What does the fleet number 13 mean?"
+    QASession(song=SONGS[0], excerpt=EXCERPT, cache=cache).ask(ScriptedClient(), question)
+
+    repeat = QASession(song=SONGS[0], excerpt=EXCERPT, cache=cache)
+    result = repeat.ask(ScriptedClient(), question)
+
+    assert result["cached"]
+    assert not repeat.turns[0].searched
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from lyricsgpt import (
+    SONG_PROMPTS,
+    GenerationConfig,
+    QualityReport,
+    create_lyrics_dataset,
+    generate_validated_batch,
+)
+
+
+class FailingClient:
+    def __init__(self) -> None:
+        self.calls = []
+        self.responses = self
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(output_text="no labels at all", status="completed")
+
+
+def test_retry_temperature_steps_down_from_base_config():
+    client = FailingClient()
+
+    songs, report = generate_validated_batch(client, SONG_PROMPTS[:1], GenerationConfig())
+
+    assert [call["temperature"] for call in client.calls] == [0.95, 0.8, 0.65]
+    assert report.failed == [SONG_PROMPTS[0].title]
+    assert len(songs) == 1
+
+
+def test_retry_never_warms_a_cold_base_temperature():
+    client = FailingClient()
+
+    generate_validated_batch(client, SONG_PROMPTS[:1], GenerationConfig(temperature=0.0))
+
+    assert [call["temperature"] for call in client.calls] == [0.0, 0.0, 0.0]
+
+
+def test_report_is_filled_without_persisting():
+    report = QualityReport()
+
+    create_lyrics_dataset(
+        FailingClient(), SONG_PROMPTS[:2], GenerationConfig(), persist=False, report=report
+    )
+
+    assert report.total == 2
+    assert report.failed == [prompt.title for prompt in SONG_PROMPTS[:2]]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from lyricsgpt import GenerationConfig, answer_question
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "generated_lyrics.json"
+SONGS = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+CHORUS_LINE = "And it’s all glitter in the rearview, fading into shades of blue,"
+
+
+class RecordingClient:
+    def __init__(self) -> None:
+        self.calls = []
+        self.responses = self
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(output_text="answer", id="resp_1")
+
+
+def _ask(question: str, excerpt: str, budget: int):
+    client = RecordingClient()
+    result = answer_question(
+        client,
+        GenerationConfig(),
+        song=SONGS[0],
+        excerpt=excerpt,
+        question=question,
+        allow_web=False,
+        token_budget=budget,
+    )
+    return result, client.calls[0]["input"][1]["content"]
+
+
+def test_long_question_is_trimmed_to_budget():
+    result, prompt = _ask("why " * 2000, CHORUS_LINE, budget=1200)
+
+    assert result["packed_tokens"] <= 1200
+    assert CHORUS_LINE in prompt
+    assert "No excerpt provided." not in prompt
+
+
+def test_matched_excerpt_lines_survive_an_exhausted_budget():
+    pasted = (CHORUS_LINE + "\n") * 40
+
+    result, prompt = _ask("What does this mean?", pasted, budget=50)
+
+    assert result["excerpt_match"] is not None
+    assert CHORUS_LINE in prompt
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from lyricsgpt import SongCatalog, SongRecord, records
+
+SONG = {
+    "title": "Rearview",
+    "theme": "leaving",
+    "vibe": "synth-pop",
+    "twist": "it was a dream",
+    "lyrics": "[Chorus]\nAll glitter in the rearview",
+}
+
+
+def _write(tmp_path, data):
+    path = tmp_path / "songs.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_nested_objects_stay_inside_their_song(tmp_path):
+    meta = {"source": {"model": "gpt-4o-mini"}, "tags": [{"name": "pop"}]}
+    catalog = SongCatalog.from_json(_write(tmp_path, [{**SONG, "meta": meta}, SONG]))
+
+    assert len(catalog) == 2
+    assert catalog[0]["meta"] == meta
+    assert not isinstance(catalog[0]["meta"], SongRecord)
+    assert catalog[0].to_dict() == {**SONG, "meta": meta}
+    assert catalog[1].lyrics == SONG["lyrics"]
+
+
+def test_wrapped_file_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SongCatalog.from_json(_write(tmp_path, {"songs": [SONG]}))
+
+
+def test_shared_metadata_strings_are_interned():
+    first = SongRecord.from_dict(json.loads(json.dumps(SONG)))
+    second = SongRecord.from_dict(json.loads(json.dumps({**SONG, "title": "Other"})))
+
+    assert first.theme is second.theme
+    assert first.vibe is second.vibe
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_non_ascii_lyrics_round_trip(compress):
+    lyrics = "It’s “déjà vu” in the rearview — 夜のドライブ 🚗\n" * 20
+    catalog = SongCatalog([{**SONG, "lyrics": lyrics}, {**SONG, "lyrics": ""}], compress=compress)
+
+    assert catalog[0].lyrics == lyrics
+    assert catalog[1].lyrics == ""
+    assert catalog[0]._lyrics is None  # decoded from the shared buffer on access
+
+
+def test_record_compares_equal_to_its_dict():
+    record = SongCatalog([{**SONG, "year": 2024}])[0]
+
+    assert record == {**SONG, "year": 2024}
+    assert dict(record) == {**SONG, "year": 2024}
+    assert record != SONG
+
+
+def test_songs_are_decoded_across_read_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(records, "CHUNK_CHARS", 7)
+    songs = [{**SONG, "title": f"Song {idx}", "plays": idx * 1000} for idx in range(5)]
+
+    catalog = SongCatalog.from_json(_write(tmp_path, songs))
+
+    assert [record.to_dict() for record in catalog] == songs
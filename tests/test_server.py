@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+from lyricsgpt import SongCatalog
+from lyricsgpt.server import FakeOpenAI, LyricsAPI, LyricsHTTPServer, WorkerPool
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "generated_lyrics.json"
+SONGS = SongCatalog.from_json(DATA_PATH)
+
+
+class BlockingClient(FakeOpenAI):
+    """Holds every model call until ``release`` is set."""
+
+    def __init__(self) -> None:
+        super().__init__(latency=0.0)
+        self.release = threading.Event()
+
+    def create(self, **kwargs):
+        self.release.wait(timeout=10)
+        return super().create(**kwargs)
+
+
+@pytest.fixture
+def make_server():
+    started = []
+
+    def start(client=None):
+        api = LyricsAPI(
+            client=client or FakeOpenAI(latency=0.0),
+            songs=SONGS,
+            pool=WorkerPool(workers=1, queue_size=1),
+            allow_web=False,
+        )
+        httpd = LyricsHTTPServer(("127.0.0.1", 0), api, quiet=True)
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.start()
+        started.append((httpd, thread))
+        return httpd
+
+    yield start
+    for httpd, thread in started:
+        if thread.is_alive():
+            httpd.graceful_shutdown()
+        thread.join()
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server()
+
+
+def _request(server, method: str, path: str, body: bytes = b"", headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response, payload
+
+
+def _post(server, body: bytes, headers=None):
+    response, payload = _request(server, "POST", "/answer", body, headers)
+    return response.status, payload
+
+
+def test_shutdown_does_not_wait_for_idle_keep_alive_client(server):
+    client = socket.create_connection(server.server_address, timeout=5)
+    client.sendall(b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n")
+    assert b"200 OK" in client.recv(4096)
+
+    stopper = threading.Thread(target=server.graceful_shutdown)
+    stopper.start()
+    stopper.join(timeout=5)
+
+    assert not stopper.is_alive()
+    client.close()
+
+
+def test_negative_content_length_is_rejected(server):
+    status, payload = _post(server, b"", headers={"Content-Length": "-1"})
+
+    assert status == 400
+    assert payload["error"] == "Invalid Content-Length"
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [("allow_web", "false"), ("max_search_results", True), ("max_search_results", "3")],
+)
+def test_non_json_typed_fields_are_rejected(server, field, value):
+    body = {"title": SONGS[0].title, "question": "Why?", field: value}
+
+    status, payload = _post(server, json.dumps(body).encode())
+
+    assert status == 400
+    assert field in payload["error"]
+
+
+def test_answer_round_trip(server):
+    body = {"title": SONGS[0].title, "question": "Why?", "allow_web": False}
+
+    status, payload = _post(server, json.dumps(body).encode())
+
+    assert status == 200
+    assert payload["answer"].startswith("(fake answer)")
+
+
+def test_full_pool_answers_429_with_retry_after(make_server):
+    client = BlockingClient()
+    server = make_server(client)
+    results = []
+
+    def ask(question):
+        body = json.dumps({"title": SONGS[0].title, "question": question}).encode()
+        results.append(_request(server, "POST", "/answer", body))
+
+    try:
+        waiting = [threading.Thread(target=ask, args=(q,)) for q in ("Why?", "Who?")]
+        for thread in waiting:
+            thread.start()
+        for _ in range(200):
+            if server.api.pool.stats()["in_flight"] == 2:
+                break
+            time.sleep(0.01)
+
+        ask("When?")
+        response, payload = results.pop()
+    finally:
+        client.release.set()
+    for thread in waiting:
+        thread.join()
+
+    assert response.status == 429
+    assert response.getheader("Retry-After") == "1"
+    assert [queued.status for queued, _ in results] == [200, 200]
+
+
+def test_song_details_hide_the_twist(server):
+    response, payload = _request(server, "GET", "/songs/" + quote(SONGS[0].title))
+
+    assert response.status == 200
+    assert set(payload) == {"title", "theme", "vibe", "lyrics"}
+    assert payload["lyrics"] == SONGS[0].lyrics
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from lyricsgpt import validate_lyrics
+from lyricsgpt.validation import count_lyric_words
+
+SONG = """**Verse 1**
+Neon on the water, I drive until it's gone,
+
+**Chorus:**
+All glitter in the rearview, singing on and on,
+
+**Bridge**
+Thirteen miles to freedom and a fleet I never knew,
+
+**Outro**
+Leaving glitter in the rearview, me and you."""
+
+
+def test_labelled_song_within_limit_passes():
+    result = validate_lyrics(SONG, max_words=100)
+
+    assert result.ok
+    assert result.sections == ("verse", "chorus", "bridge", "outro")
+    assert result.word_count == 36
+
+
+def test_lyric_line_starting_with_a_label_word_is_not_a_section():
+    song = SONG.replace("**Bridge**", "Bridge over the river, I wait")
+
+    result = validate_lyrics(song, max_words=100)
+
+    assert result.issues == ("missing_sections:bridge",)
+    assert count_lyric_words(song) == 42
+
+
+def test_too_long_and_truncated_drafts_fail():
+    result = validate_lyrics(SONG, max_words=20, truncated=True)
+
+    assert result.issues == ("truncated", "too_long")
+
+
+def test_empty_draft_reports_every_problem():
+    result = validate_lyrics("", max_words=100)
+
+    assert result.issues == ("empty", "missing_sections:verse,chorus,bridge,outro")